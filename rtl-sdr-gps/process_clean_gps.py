@@ -35,7 +35,7 @@ except ImportError:
 
 try:
     from scipy import signal
-    from scipy.fft import fft, fftfreq, fftshift
+    from scipy.fft import fftshift, set_workers
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
@@ -65,40 +65,30 @@ class CleanGPSProcessor:
         skip_samples = int(skip_seconds * self.sample_rate)
         skip_values = skip_samples * 2  # 2 values per IQ sample
 
-        # Calculate how many values to read (2 per sample)
-        read_count = -1  # -1 means read all
-        if max_samples is not None:
-            read_count = (max_samples + skip_samples) * 2
-
-        # Read as int16 array
-        raw_data = np.fromfile(filename, dtype=np.int16, count=read_count)
+        # Map the file instead of reading it - only the samples actually kept
+        # are paged in, and the skipped lead-in is never loaded at all
+        file_size = os.path.getsize(filename)
+        total_samples = file_size // 4  # 2 int16 values per IQ sample
+        if total_samples > 0:
+            raw_data = np.memmap(filename, dtype=np.int16, mode='r', shape=(total_samples * 2,))
+        else:
+            raw_data = np.zeros(0, dtype=np.int16)
 
-        print(f"  Raw values read: {len(raw_data):,}")
+        print(f"  Raw values available: {len(raw_data):,}")
 
-        # Skip initial values
-        if len(raw_data) > skip_values:
+        # Skip initial samples and limit to max_samples
+        if total_samples > skip_samples:
             raw_data = raw_data[skip_values:]
             print(f"  Skipped first {skip_seconds * 1000:.0f} ms ({skip_values:,} values)")
+        if max_samples is not None:
+            raw_data = raw_data[:max_samples * 2]
 
-        # Ensure even number of values (IQ pairs)
-        if len(raw_data) % 2 != 0:
-            raw_data = raw_data[:-1]
-
-        # Convert to complex samples
-        num_samples = len(raw_data) // 2
-
-        # Extract I and Q components
-        I = raw_data[0::2].astype(np.float32)  # Even indices: I
-        Q = raw_data[1::2].astype(np.float32)  # Odd indices: Q
-
+        # Convert straight into complex64: interleaved I/Q int16 pairs line up
+        # with the (real, imag) float32 pairs, so one scaled cast does it
         # Normalize: (-32768 to +32767) → (-1.0 to +1.0)
-        I = I / 32768.0
-        Q = Q / 32768.0
+        samples = np.empty(len(raw_data) // 2, dtype=np.complex64)
+        np.multiply(raw_data, np.float32(1 / 32768.0), out=samples.view(np.float32))
 
-        # Create complex samples
-        samples = I + 1j * Q
-
-        file_size = os.path.getsize(filename)
         duration = len(samples) / self.sample_rate
 
         print(f"  File size: {file_size / 1e9:.2f} GB ({file_size / 1e6:.1f} MB)")
@@ -122,14 +112,17 @@ class CleanGPSProcessor:
             import time
             start_time = time.time()
 
-            f, t, Sxx = signal.spectrogram(
-                samples,
-                fs=self.sample_rate,
-                nperseg=nperseg,
-                noverlap=noverlap,
-                window='boxcar',
-                return_onesided=False
-            )
+            # spectrogram's FFTs go through scipy.fft, which is single-threaded
+            # unless given workers - spread the frames over every core
+            with set_workers(os.cpu_count() or 1):
+                f, t, Sxx = signal.spectrogram(
+                    samples,
+                    fs=self.sample_rate,
+                    nperseg=nperseg,
+                    noverlap=noverlap,
+                    window='boxcar',
+                    return_onesided=False
+                )
 
             elapsed = time.time() - start_time
             print(f"  Spectrogram computed in {elapsed:.1f} seconds")
@@ -138,25 +131,35 @@ class CleanGPSProcessor:
             f = fftshift(f)
             Sxx = fftshift(Sxx, axes=0)
         else:
-            # Manual spectrogram using numpy
+            # Manual spectrogram using numpy - one FFT call per batch of frames
+            # rather than a Python-level loop per frame (scipy's fft names
+            # aren't available on this path, so use np.fft)
             hop_size = nperseg - noverlap
-            num_frames = (len(samples) - nperseg) // hop_size + 1
+            frames = np.lib.stride_tricks.sliding_window_view(samples, nperseg)[::hop_size]
+            num_frames = len(frames)
 
-            Sxx = np.zeros((nperseg, num_frames))
+            # float32 like scipy's result for complex64 samples - halves the
+            # memory every later pass over the spectrogram has to stream
+            Sxx = np.empty((nperseg, num_frames), dtype=np.float32)
             t = np.arange(num_frames) * hop_size / self.sample_rate
+            window = np.hanning(nperseg).astype(np.float32)
 
-            for i in range(num_frames):
-                start = i * hop_size
-                frame = samples[start:start + nperseg]
-                if len(frame) == nperseg:
-                    windowed = frame * np.hanning(nperseg)
-                    spectrum = np.abs(fft(windowed)) ** 2
-                    Sxx[:, i] = fftshift(spectrum)
+            batch_frames = 256
+            for start in range(0, num_frames, batch_frames):
+                stop = min(start + batch_frames, num_frames)
+                spectrum = np.fft.fft(frames[start:stop] * window, axis=1)
+                power = np.square(spectrum.real)
+                power += np.square(spectrum.imag)
+                Sxx[:, start:stop] = np.fft.fftshift(power, axes=1).T
 
-            f = fftshift(fftfreq(nperseg, 1/self.sample_rate))
+            f = np.fft.fftshift(np.fft.fftfreq(nperseg, 1/self.sample_rate))
 
-        # Convert to dB
-        Sxx_db = 10 * np.log10(Sxx + 1e-12)
+        # Convert to dB in place - Sxx isn't needed afterwards, so no
+        # spectrogram-sized temporaries for the add/log/scale steps
+        Sxx_db = Sxx
+        Sxx_db += 1e-12
+        np.log10(Sxx_db, out=Sxx_db)
+        Sxx_db *= 10
 
         print(f"  Time bins: {len(t)}")
         print(f"  Frequency bins: {len(f)}")
@@ -168,8 +171,11 @@ class CleanGPSProcessor:
         """Generate analysis report for clean GPS data"""
 
         # Basic statistics
-        avg_power = np.mean(np.abs(samples) ** 2)
-        peak_power = np.max(np.abs(samples) ** 2)
+        # |x|^2 once, without the sqrt inside np.abs
+        power = np.square(samples.real)
+        power += np.square(samples.imag)
+        avg_power = np.mean(power)
+        peak_power = np.max(power)
 
         # Spectrum statistics
         avg_spectrum = np.mean(Sxx_db, axis=1)
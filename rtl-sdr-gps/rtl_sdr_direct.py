@@ -38,8 +38,13 @@ Date: December 2025
 """
 
 import argparse
+import ctypes
+import ctypes.util
 import subprocess
 import os
+import platform
+import selectors
+import shutil
 import sys
 import time
 from datetime import datetime
@@ -53,27 +58,73 @@ class RTLSDRGPSRecorder:
         self.sample_rate = 2048000   # 2.048 MSPS
         self.gain = 0                # 0 = Auto gain (AGC)
         self.bias_tee = True         # Enable bias-T for active antenna
+        # USB bulk transfer size passed to rtl_sdr -b (default 16 x 16384 B).
+        # Smaller transfers make the host poll the dongle more often, which
+        # avoids dropouts on macOS/Windows where libusb completion latency is
+        # higher, at the cost of some CPU. Linux copes fine with the default,
+        # so None leaves -b off there.
+        self.usb_buffer_bytes = None if platform.system() == 'Linux' else 8192
         self.process = None
         self.recording = False
 
     def check_rtlsdr_installed(self):
         """Check if rtl_sdr command is available"""
-        try:
-            result = subprocess.run(['which', 'rtl_sdr'],
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                print("ERROR: rtl_sdr command not found!")
-                print("Install rtl-sdr tools:")
-                print("  macOS: brew install librtlsdr")
-                print("  Linux: sudo apt-get install rtl-sdr")
-                return False
-            return True
-        except Exception as e:
-            print(f"ERROR checking rtl_sdr: {e}")
+        if shutil.which('rtl_sdr') is None:
+            print("ERROR: rtl_sdr command not found!")
+            print("Install rtl-sdr tools:")
+            print("  macOS: brew install librtlsdr")
+            print("  Linux: sudo apt-get install rtl-sdr")
             return False
+        return True
+
+    def list_devices(self):
+        """
+        List connected RTL-SDR devices via librtlsdr
+
+        A direct library call answers in microseconds, whereas probing with
+        rtl_test stalls for up to 2 s.
+
+        Returns:
+            List of device names, or None if librtlsdr cannot be loaded
+        """
+        if platform.system() == 'Darwin':
+            candidates = ['librtlsdr.dylib', '/opt/homebrew/lib/librtlsdr.dylib',
+                          '/usr/local/lib/librtlsdr.dylib']
+        else:
+            candidates = ['librtlsdr.so.0', 'librtlsdr.so']
+        candidates.insert(0, ctypes.util.find_library('rtlsdr'))
+
+        for name in candidates:
+            if not name:
+                continue
+            try:
+                lib = ctypes.CDLL(name)
+            except OSError:
+                continue
+
+            lib.rtlsdr_get_device_count.restype = ctypes.c_uint32
+            lib.rtlsdr_get_device_name.argtypes = [ctypes.c_uint32]
+            lib.rtlsdr_get_device_name.restype = ctypes.c_char_p
+            count = lib.rtlsdr_get_device_count()
+            return [lib.rtlsdr_get_device_name(i).decode(errors='replace')
+                    for i in range(count)]
+
+        return None
 
     def check_device_present(self):
         """Check if RTL-SDR device is connected"""
+        devices = self.list_devices()
+        if devices is not None:
+            if not devices:
+                print("ERROR: No RTL-SDR device found!")
+                print("Check USB connection and device permissions.")
+                return False
+            print("✓ RTL-SDR device detected")
+            for i, name in enumerate(devices):
+                print(f"  {i}: {name}")
+            return True
+
+        # librtlsdr not loadable from Python - fall back to probing with rtl_test
         try:
             result = subprocess.run(['rtl_test', '-t'],
                                   capture_output=True, text=True, timeout=2)
@@ -103,7 +154,8 @@ class RTLSDRGPSRecorder:
         try:
             # RTL-SDR Blog V3/V4 bias-T control
             result = subprocess.run(['rtl_biast', '-b', '1'],
-                                  capture_output=True, text=True, timeout=5)
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  timeout=5)
             if result.returncode == 0:
                 print("✓ Bias-T enabled (GPS antenna powered)")
                 return True
@@ -128,7 +180,8 @@ class RTLSDRGPSRecorder:
 
         try:
             subprocess.run(['rtl_biast', '-b', '0'],
-                         capture_output=True, text=True, timeout=5)
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         timeout=5)
             print("✓ Bias-T disabled")
         except:
             pass  # Ignore errors during cleanup
@@ -166,6 +219,8 @@ class RTLSDRGPSRecorder:
         print(f"  Sample Rate:   {self.sample_rate / 1e6:.3f} MSPS")
         print(f"  Gain:          Auto (AGC enabled)")
         print(f"  Bias-T:        {'ENABLED' if self.bias_tee else 'DISABLED'}")
+        usb_buffer = f"{self.usb_buffer_bytes} bytes" if self.usb_buffer_bytes else "rtl_sdr default"
+        print(f"  USB Buffer:    {usb_buffer}")
         print(f"  Duration:      {duration_seconds} seconds ({duration_seconds/60:.1f} minutes)")
         print(f"  Output File:   {output_file}")
         print(f"  Expected Size: {size_mb:.1f} MB ({size_gb:.2f} GB)")
@@ -177,6 +232,7 @@ class RTLSDRGPSRecorder:
         #   -s <sample_rate>   : Sample rate
         #   -g <gain>          : Gain (0 = auto)
         #   -n <samples>       : Number of samples to read
+        #   -b <bytes>         : USB transfer / output block size
 
         num_samples = self.sample_rate * duration_seconds
 
@@ -186,8 +242,10 @@ class RTLSDRGPSRecorder:
             '-s', str(self.sample_rate),
             '-g', str(self.gain),  # 0 = Auto gain
             '-n', str(num_samples),
-            output_file
         ]
+        if self.usb_buffer_bytes:
+            cmd += ['-b', str(self.usb_buffer_bytes)]
+        cmd.append(output_file)
 
         print(f"\nCommand: {' '.join(cmd)}")
         print("\nStarting recording...")
@@ -201,20 +259,26 @@ class RTLSDRGPSRecorder:
             self.process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
+                stderr=subprocess.STDOUT
             )
 
             # Monitor progress
-            bytes_written = 0
+            # Block on rtl_sdr output (or a 1 s timeout) instead of polling
+            # every 100 ms - we only wake when there is something to do
+            selector = selectors.DefaultSelector()
+            selector.register(self.process.stdout, selectors.EVENT_READ)
             last_update = time.time()
 
             while self.recording and self.process.poll() is None:
+                for key, _ in selector.select(timeout=1.0):
+                    # Drain rtl_sdr output so the pipe never fills up
+                    if not os.read(key.fd, 4096):
+                        selector.unregister(key.fileobj)
+
                 # Check file size periodically
                 if os.path.exists(output_file):
-                    current_size = os.path.getsize(output_file)
                     if time.time() - last_update >= 1.0:  # Update every second
+                        current_size = os.path.getsize(output_file)
                         elapsed = time.time() - start_time
                         progress = (current_size / total_bytes) * 100
                         speed = current_size / elapsed / (1024 * 1024)  # MB/s
@@ -226,7 +290,7 @@ class RTLSDRGPSRecorder:
 
                         last_update = time.time()
 
-                time.sleep(0.1)
+            selector.close()
 
             # Wait for process to complete
             if self.process:
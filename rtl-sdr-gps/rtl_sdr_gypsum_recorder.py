@@ -12,6 +12,11 @@ Gypsum Requirements:
 
 RTL-SDR records in uint8 format, so we convert to float32.
 
+With --output-format uint8 the native RTL-SDR stream (interleaved offset-binary
+uint8 I/Q, 127.5 = zero) is written as-is: no conversion pass and a quarter of
+the disk bandwidth and storage. Gypsum itself needs float32, but GNSS-SDR and
+the spectrum analyzers in this directory read the uint8 format directly.
+
 Usage:
     python3 rtl_sdr_gypsum_recorder.py --duration 60 --output gps_samples.dat
 """
@@ -19,11 +24,30 @@ Usage:
 import argparse
 import subprocess
 import os
+import shutil
 import sys
+import tempfile
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    CUPY_AVAILABLE = False
+
+# uint8 values (I and Q) read from rtl_sdr per pass - 1 MiB in, 4 MiB of float32 out
+CHUNK_SAMPLES = 1 << 20
+# Larger batches when converting on a CUDA GPU so the PCIe round trip is
+# amortized (64 MiB in, 256 MiB out)
+GPU_CHUNK_SAMPLES = 64 << 20
+# At most this many CPU threads share a chunk - each keeps a 256 KiB slice,
+# so dispatch overhead stays small next to the conversion itself
+MAX_CONVERT_WORKERS = 4
+
 
 class RTLSDRGypsumRecorder:
     """RTL-SDR GPS recorder for Gypsum decoder"""
@@ -35,15 +59,24 @@ class RTLSDRGypsumRecorder:
         self.sample_rate = 2048000   # 2.048 MSPS (close to Gypsum's 2.046)
         self.gain = 0  # Auto gain
         self.bias_tee = True
+        self.output_format = 'float32'  # 'float32' (Gypsum) or 'uint8' (native)
+
+        self.use_gpu = CUPY_AVAILABLE
+        # CPU threads sharing each chunk's conversion (the ufuncs release the GIL)
+        self.workers = min(os.cpu_count() or 1, MAX_CONVERT_WORKERS)
+
+        # Conversion buffers, allocated once and reused for every chunk
+        chunk = GPU_CHUNK_SAMPLES if self.use_gpu else CHUNK_SAMPLES
+        self._raw = np.empty(chunk, dtype=np.uint8)
+        self._cvt = np.empty(chunk, dtype=np.float32)
+
+        if self.use_gpu:
+            # uint8 [0-255] → float [-1, +1] for every possible input value
+            self._gpu_lut = cp.asarray((np.arange(256, dtype=np.float32) - 127.5) / 127.5)
 
     def check_rtlsdr(self):
         """Check RTL-SDR availability"""
-        try:
-            result = subprocess.run(['which', 'rtl_sdr'],
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return shutil.which('rtl_sdr') is not None
 
     def enable_bias_tee(self):
         """Enable bias-T for active antenna"""
@@ -51,7 +84,8 @@ class RTLSDRGypsumRecorder:
             return
         try:
             subprocess.run(['rtl_biast', '-b', '1'],
-                         capture_output=True, timeout=5)
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         timeout=5)
             print("✓ Bias-T enabled")
         except:
             print("⚠ Bias-T control not available")
@@ -62,18 +96,73 @@ class RTLSDRGypsumRecorder:
             return
         try:
             subprocess.run(['rtl_biast', '-b', '0'],
-                         capture_output=True, timeout=5)
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         timeout=5)
             print("✓ Bias-T disabled")
         except:
             pass
 
+    def _convert_chunk(self, raw, dst, pool):
+        """Convert uint8 I/Q values in raw into float32 values in dst"""
+        if self.use_gpu:
+            # Gather at GPU memory bandwidth, copy back straight into dst
+            self._gpu_lut.take(cp.asarray(raw)).get(out=dst)
+        elif pool is None:
+            self._scale_into(raw, dst)
+        else:
+            # One slice per worker, each written in place at its offset
+            step = -(-len(raw) // self.workers)
+            list(pool.map(lambda i: self._scale_into(raw[i:i + step], dst[i:i + step]),
+                          range(0, len(raw), step)))
+
+    @staticmethod
+    def _scale_into(raw, dst):
+        """uint8 [0-255] → float [-1, +1], in place in dst (no temporaries)"""
+        np.copyto(dst, raw)
+        dst -= 127.5
+        dst /= 127.5
+
+    def _convert_stream(self, src, output_file, num_values):
+        """
+        Convert a uint8 IQ stream to complex float32 (Gypsum format)
+
+        Args:
+            src: Binary file object producing interleaved uint8 I/Q
+            output_file: Output file path (GNU Radio format, float32)
+            num_values: Expected number of uint8 values (I and Q)
+
+        Returns:
+            Number of uint8 values (I and Q) converted
+        """
+        # Stream the uint8 IQ samples through the preallocated buffers
+        # chunk by chunk instead of loading the whole recording
+        converted = 0
+        parallel = not self.use_gpu and self.workers > 1
+        with open(output_file, 'wb') as out_f, \
+                ThreadPoolExecutor(self.workers) if parallel else nullcontext() as pool:
+            while converted < num_values:
+                n = src.readinto(self._raw)
+                if not n:
+                    break
+                n = min(n, num_values - converted)
+
+                # Scale to complex float32 in place (on the GPU via a lookup table)
+                # cvt is [I0, Q0, I1, Q1, ...], i.e. interleaved
+                # complex64 (GNU Radio format)
+                cvt = self._cvt[:n]
+                self._convert_chunk(self._raw[:n], cvt, pool)
+                out_f.write(cvt)
+                converted += n
+
+        return converted
+
     def record(self, duration_seconds, output_file):
         """
         Record GPS signals in Gypsum-compatible format
 
         Args:
             duration_seconds: Recording duration
-            output_file: Output file path (GNU Radio format, float32)
+            output_file: Output file path (GNU Radio format, float32 or uint8)
         """
         print("="*60)
         print("RTL-SDR GPS Recorder for Gypsum")
@@ -85,9 +174,8 @@ class RTLSDRGypsumRecorder:
 
         self.enable_bias_tee()
 
-        # Record to temporary file (uint8 format)
-        temp_file = output_file + ".tmp"
         num_samples = self.sample_rate * duration_seconds
+        native = self.output_format == 'uint8'
 
         # Calculate sizes
         uint8_size_mb = (num_samples * 2) / (1024 * 1024)  # 2 bytes per sample (I+Q)
@@ -99,62 +187,70 @@ class RTLSDRGypsumRecorder:
         print(f"  Duration:     {duration_seconds}s ({duration_seconds/60:.1f} min)")
         print(f"  Gain:         Auto (AGC)")
         print(f"  Bias-T:       {'Enabled' if self.bias_tee else 'Disabled'}")
-        print(f"\n  Temp size:    {uint8_size_mb:.1f} MB (uint8)")
-        print(f"  Final size:   {float32_size_mb:.1f} MB (float32)")
-        print(f"  Format:       GNU Radio (complex float32)")
-
-        # Step 1: Record with rtl_sdr (uint8)
-        print(f"\nStep 1/2: Recording from RTL-SDR...")
+        if native:
+            print(f"\n  Final size:   {uint8_size_mb:.1f} MB (uint8)")
+            print(f"  Format:       Native RTL-SDR (interleaved uint8 I/Q)")
+        else:
+            print(f"\n  Raw stream:   {uint8_size_mb:.1f} MB (uint8)")
+            print(f"  Final size:   {float32_size_mb:.1f} MB (float32)")
+            print(f"  Format:       GNU Radio (complex float32)")
+            print(f"  Conversion:   {'GPU (CuPy)' if self.use_gpu else 'CPU'}")
+
+        if native:
+            # rtl_sdr already produces the requested format - let it write
+            # the output file itself, nothing to convert
+            print(f"\nRecording from RTL-SDR (uint8)...")
+        else:
+            # Record with rtl_sdr (uint8) to stdout and convert on the fly
+            print(f"\nRecording from RTL-SDR and converting to Gypsum format (float32)...")
         cmd = [
             'rtl_sdr',
             '-f', str(self.frequency),
             '-s', str(self.sample_rate),
             '-g', str(self.gain),
             '-n', str(num_samples),
-            temp_file
+            output_file if native else '-'  # '-' writes samples to stdout
         ]
 
         try:
             start_time = time.time()
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode != 0:
-                print(f"ERROR: rtl_sdr failed: {result.stderr}")
-                return False
+            with tempfile.TemporaryFile() as err_f:
+                # rtl_sdr keeps capturing into the pipe while we convert and
+                # write the previous chunk, so USB capture, conversion and
+                # disk I/O overlap instead of running as two sequential passes
+                stdout = subprocess.DEVNULL if native else subprocess.PIPE
+                process = subprocess.Popen(cmd, stdout=stdout, stderr=err_f)
+                try:
+                    if not native:
+                        converted = self._convert_stream(process.stdout, output_file,
+                                                         num_samples * 2)
+                    process.wait()
+                except BaseException:
+                    process.kill()
+                    raise
+                finally:
+                    if process.stdout:
+                        process.stdout.close()
+                    process.wait()
+
+                if process.returncode != 0:
+                    err_f.seek(0)
+                    print(f"ERROR: rtl_sdr failed: {err_f.read().decode(errors='replace')}")
+                    return False
 
             elapsed = time.time() - start_time
             print(f"✓ Recorded {duration_seconds}s in {elapsed:.1f}s")
+            if not native:
+                print(f"✓ Converted {converted//2:,} samples to float32")
 
         except KeyboardInterrupt:
             print("\n\nRecording interrupted")
-            self.disable_bias_tee()
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            if os.path.exists(output_file):
+                os.remove(output_file)
             return False
 
-        # Step 2: Convert uint8 → float32 (Gypsum format)
-        print(f"\nStep 2/2: Converting to Gypsum format (float32)...")
-        try:
-            # Read uint8 IQ samples
-            iq_uint8 = np.fromfile(temp_file, dtype=np.uint8)
-
-            # Convert to complex float32
-            # uint8 [0-255] → float [-1, +1]
-            iq_float = (iq_uint8.astype(np.float32) - 127.5) / 127.5
-
-            # Interleave I/Q as complex64 (GNU Radio format)
-            # iq_float is [I0, Q0, I1, Q1, ...]
-            # Complex64 expects interleaved float32
-            iq_float.tofile(output_file)
-
-            print(f"✓ Converted {len(iq_uint8)//2:,} samples to float32")
-
-            # Cleanup temp file
-            os.remove(temp_file)
-
         except Exception as e:
             print(f"ERROR during conversion: {e}")
-            self.disable_bias_tee()
             return False
 
         finally:
@@ -168,9 +264,14 @@ class RTLSDRGypsumRecorder:
             print(f"{'='*60}")
             print(f"  File:     {output_file}")
             print(f"  Size:     {size_mb:.1f} MB")
-            print(f"  Format:   Complex float32 (Gypsum compatible)")
-            print(f"  Samples:  {os.path.getsize(output_file) // 8:,}")
-            print(f"\nNext: Process with Gypsum")
+            if native:
+                print(f"  Format:   Interleaved uint8 I/Q (native RTL-SDR)")
+                print(f"  Samples:  {os.path.getsize(output_file) // 2:,}")
+                print(f"\nNext: Process with GNSS-SDR or gps_spectrum_analyzer.py")
+            else:
+                print(f"  Format:   Complex float32 (Gypsum compatible)")
+                print(f"  Samples:  {os.path.getsize(output_file) // 8:,}")
+                print(f"\nNext: Process with Gypsum")
             return True
         else:
             print("\nERROR: Output file not created!")
@@ -189,6 +290,9 @@ def main():
                        help='Output filename (default: auto-generated)')
     parser.add_argument('--no-bias-tee', action='store_true',
                        help='Disable bias-T')
+    parser.add_argument('--output-format', choices=['float32', 'uint8'], default='float32',
+                       help='float32 for Gypsum (default) or native uint8 I/Q '
+                            '(no conversion, 4x smaller)')
 
     args = parser.parse_args()
 
@@ -201,6 +305,7 @@ def main():
 
     recorder = RTLSDRGypsumRecorder()
     recorder.bias_tee = not args.no_bias_tee
+    recorder.output_format = args.output_format
 
     success = recorder.record(args.duration, args.output)
     sys.exit(0 if success else 1)
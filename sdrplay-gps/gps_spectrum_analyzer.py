@@ -15,10 +15,17 @@ Usage:
 Author: GPS Spectrum Analyzer for GNSS jamming detection
 """
 
+import os
+
+# BLAS/OpenMP pools size themselves when the libraries are loaded, so the
+# thread counts have to be in the environment before numpy is imported
+# (setdefault keeps any limit the caller exported)
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+    os.environ.setdefault(_var, str(os.cpu_count() or 1))
+
 import numpy as np
 import argparse
 import sys
-import os
 from datetime import datetime
 import json
 
@@ -27,6 +34,7 @@ try:
     matplotlib.use('Agg')  # Non-interactive backend
     import matplotlib.pyplot as plt
     from matplotlib.gridspec import GridSpec
+    from matplotlib.colorbar import make_axes_gridspec
     PLOTTING_AVAILABLE = True
 except ImportError:
     PLOTTING_AVAILABLE = False
@@ -34,20 +42,145 @@ except ImportError:
 
 try:
     from scipy import signal
-    from scipy.fft import fft, fftfreq, fftshift
+    from scipy.fft import fft, next_fast_len
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
     print("Warning: scipy not available, using numpy FFT")
 
+# Spectrogram frames transformed per batched FFT call (4096 x 2048-pt complex64 = 64 MB)
+SPECTROGRAM_BATCH_FRAMES = 4096
+
+# Elements per chunk when scanning sample-length arrays (keeps masks cache-sized)
+SCAN_CHUNK = 1 << 20
+
+# Largest numpy-fallback FFT done as one matrix product against a windowed DFT
+# matrix - beyond this the O(n^2) GEMM loses to np.fft's O(n log n)
+DFT_GEMM_MAX_NPERSEG = 64
+
+
+def moving_average(x, window_size):
+    """Box-filter x, equivalent to np.convolve(x, np.ones(w)/w, mode='same')
+
+    Uses running sums, so the cost is O(N) independent of the window size
+    instead of O(N * window_size). The output is produced SCAN_CHUNK values
+    at a time, each block re-reading the window_size - 1 inputs it shares
+    with the previous one, so the only full-length array is the result
+    (float32 for float32 input).
+    """
+    n = len(x)
+    if n < window_size or window_size < 1:
+        return np.convolve(x, np.ones(window_size)/window_size, mode='same')
+
+    # Output k averages x[k+off+1-w : k+off+1], clipped to the array edges
+    off = (window_size - 1) // 2
+    out = np.empty(n, dtype=np.result_type(x.dtype, np.float32))
+    for a in range(0, n, SCAN_CHUNK):
+        b = min(a + SCAN_CHUNK, n)
+        # csum[i] = sum of x[lo:lo + i] (float64 keeps the sums exact enough)
+        lo = max(a + off + 1 - window_size, 0)
+        hi = min(b + off, n)
+        csum = np.empty(hi - lo + 1, dtype=np.float64)
+        csum[0] = 0
+        np.cumsum(x[lo:hi], out=csum[1:])
+
+        # [a, m0) is clipped at the start, [m1, b) at the end
+        m0 = min(max(a, window_size - off - 1), b)
+        m1 = max(min(b, n - off), m0)
+        e = off + 1 - lo  # csum index of the window end for output 0
+        block = out[a:b]
+        block[:m0 - a] = csum[a + e:m0 + e] / window_size
+        block[m0 - a:m1 - a] = (csum[m0 + e:m1 + e] - csum[m0 + e - window_size:m1 + e - window_size]) / window_size
+        block[m1 - a:] = (csum[-1] - csum[m1 + e - window_size:b + e - window_size]) / window_size
+    return out
+
+
+def percentile(x, q, overwrite_input=False):
+    """Same value as np.percentile(x, q) (linear interpolation)
+
+    np.percentile does noticeably more work per call; one np.partition
+    around the two neighbouring order statistics is all a single
+    threshold needs. q may also be a sequence, in which case a list is
+    returned and every order statistic comes from the same partition.
+    With overwrite_input=True a 1-D x is partitioned in place instead of
+    copied (its order is lost, its values are kept).
+    """
+    flat = np.ravel(x)
+    qs = list(q) if np.ndim(q) else [q]
+
+    positions = []
+    kth = set()
+    for qi in qs:
+        v = (len(flat) - 1) * (qi / 100.0)
+        lo = int(v)
+        hi = min(lo + 1, len(flat) - 1)
+        positions.append((v, lo, hi))
+        kth.update((lo, hi))
+    kth = sorted(kth)
+
+    # ravel() already copied a non-contiguous x, so that copy can be reused
+    if overwrite_input or not np.may_share_memory(flat, x):
+        flat.partition(kth)
+        part = flat
+    else:
+        part = np.partition(flat, kth)
+
+    results = []
+    for v, lo, hi in positions:
+        a, b = part[lo], part[hi]
+
+        # Interpolate the way numpy does (stable towards whichever end is closer)
+        t = v - lo
+        diff = b - a
+        results.append(b - diff * (1 - t) if t >= 0.5 else a + diff * t)
+
+    return results if np.ndim(q) else results[0]
+
+
+def count_above(x, threshold):
+    """np.count_nonzero(x > threshold) without an N-element boolean mask"""
+    return sum(int(np.count_nonzero(x[i:i + SCAN_CHUNK] > threshold))
+               for i in range(0, len(x), SCAN_CHUNK))
+
+
+def spectrum_means(Sxx_db):
+    """(time-averaged spectrum, frequency-averaged power per time bin)
+
+    Same as np.mean(Sxx_db, axis=1) and np.mean(Sxx_db, axis=0), but both
+    come from one pass over cache-sized column blocks instead of two full
+    passes over the spectrogram.
+    """
+    num_freqs, num_times = Sxx_db.shape
+    block = max(1, SCAN_CHUNK // max(num_freqs, 1))
+    freq_sum = np.zeros(num_freqs, dtype=np.float64)
+    time_mean = np.empty(num_times, dtype=np.float64)
+    for start in range(0, num_times, block):
+        cols = Sxx_db[:, start:start + block]
+        freq_sum += np.sum(cols, axis=1, dtype=np.float64)
+        time_mean[start:start + block] = np.mean(cols, axis=0, dtype=np.float64)
+    return freq_sum / max(num_times, 1), time_mean
+
+
+def run_detectors(detectors):
+    """Run the detectors one after another, returning {name: result}
+
+    detectors maps name -> (function, args). They run in sequence rather
+    than side by side: each already spreads its FFT/BLAS work over the
+    cores, and one at a time only one detector's full-length temporaries
+    are alive. Their prints go straight to stdout, in the order given.
+    """
+    return {name: function(*args) for name, (function, args) in detectors.items()}
+
 
 class GPSSpectrumAnalyzer:
     """Analyzes GPS IQ samples for jamming signatures"""
 
-    def __init__(self, sample_rate=2048000):  # Default to 2.048 MSPS for GPS L1 main lobe
+    def __init__(self, sample_rate=2048000, work_rate=2.5e6):  # Default to 2.048 MSPS for GPS L1 main lobe
         self.sample_rate = sample_rate
         self.center_freq = 1575.42e6  # GPS L1
         self.gps_bandwidth = 2.046e6  # GPS L1 C/A main lobe (±1.023 MHz from center)
+        self.work_rate = work_rate  # Analysis rate: main lobe + guard band (0 = no decimation)
+        self._freq_cache = {}  # (nfft, sample_rate) -> centred frequency axis
 
     def load_samples(self, filename, max_samples=None, skip_seconds=0.3):
         """Load complex64 IQ samples from file"""
@@ -56,20 +189,24 @@ class GPSSpectrumAnalyzer:
         # Calculate samples to skip (default: skip first 300ms for SDR settling)
         skip_samples = int(skip_seconds * self.sample_rate)
 
-        # Read as complex64 (8 bytes per sample: 2x float32)
-        # Skip initial samples by offsetting file pointer
-        read_count = -1  # -1 means read all samples
-        if max_samples is not None:
-            read_count = max_samples + skip_samples  # Read extra to account for skip
+        # Map as complex64 (8 bytes per sample: 2x float32) instead of reading
+        # the whole recording into RAM - the OS pages samples in as the
+        # analysis touches them
+        file_size = os.path.getsize(filename)
+        total_samples = file_size // 8
+        if total_samples > 0:
+            samples = np.memmap(filename, dtype=np.complex64, mode='r', shape=(total_samples,))
+        else:
+            samples = np.zeros(0, dtype=np.complex64)
 
-        samples = np.fromfile(filename, dtype=np.complex64, count=read_count)
+        if max_samples is not None:
+            samples = samples[:max_samples + skip_samples]  # Extra to account for skip
 
         # Skip initial samples
         if len(samples) > skip_samples:
             samples = samples[skip_samples:]
             print(f"  Skipped first {skip_seconds * 1000:.0f} ms ({skip_samples:,} samples)")
 
-        file_size = os.path.getsize(filename)
         duration = len(samples) / self.sample_rate
 
         print(f"  File size: {file_size / 1e9:.2f} GB")
@@ -79,6 +216,98 @@ class GPSSpectrumAnalyzer:
 
         return samples
 
+    def _freqs(self, n):
+        """Centred (fftshifted) frequency axis for an n-point FFT, cached
+
+        The arrays are shared between calls and recordings, so they are
+        returned read-only.
+        """
+        key = (n, self.sample_rate)
+        if key not in self._freq_cache:
+            f = np.fft.fftshift(np.fft.fftfreq(n, 1/self.sample_rate))
+            f.flags.writeable = False
+            self._freq_cache[key] = f
+        return self._freq_cache[key]
+
+    def gps_band(self, f):
+        """Slice of the (sorted) frequency axis f inside the GPS L1 main lobe"""
+        lo = np.searchsorted(f, -self.gps_bandwidth / 2)
+        hi = np.searchsorted(f, self.gps_bandwidth / 2, side='right')
+        return slice(lo, hi)
+
+    def peak_bins(self, f, Sxx_db):
+        """Index into f of the strongest GPS-band bin in every time frame
+
+        Computed once in main() and shared by the sweep and meaconing
+        detectors, which both track this peak over time.
+        """
+        band = self.gps_band(f)
+        return band.start + np.argmax(Sxx_db[band], axis=0)
+
+    def decimate_to_main_lobe(self, samples):
+        """Low-pass filter and decimate wideband recordings towards work_rate
+
+        Detection and plotting only look at the GPS L1 C/A main lobe
+        (±1.023 MHz), so e.g. a 10 MSPS recording is reduced 4× to 2.5 MSPS
+        before the spectrogram and detectors, cutting their work and memory
+        by the same factor. Anything outside ±work_rate/2 is filtered out.
+        Updates self.sample_rate to the decimated rate.
+        """
+        if not self.work_rate or not SCIPY_AVAILABLE:
+            return samples
+
+        factor = int(self.sample_rate // self.work_rate)
+        if factor < 2:
+            return samples
+
+        print(f"\nDecimating {factor}× to {self.sample_rate / factor / 1e6:.3f} MSPS (GPS main lobe + guard band)...")
+        samples = signal.resample_poly(samples, 1, factor).astype(np.complex64, copy=False)
+        self.sample_rate /= factor
+        print(f"  Samples after decimation: {len(samples):,}")
+
+        return samples
+
+    def compute_power(self, samples):
+        """Instantaneous power |x|^2 as float32 (no sqrt, one output allocation)
+
+        Computed once in main() and shared by the detectors that need it.
+        """
+        power = np.square(samples.real, dtype=np.float32)
+        power += np.square(samples.imag, dtype=np.float32)
+        return power
+
+    def compute_psd(self, samples, nperseg=4096):
+        """Welch PSD (two-sided, unshifted) with batched multi-threaded FFTs
+
+        Same estimate as signal.welch(samples, fs, nperseg=nperseg,
+        nfft=next_fast_len(nperseg)) with its defaults - periodic Hann window,
+        50% overlap, per-segment mean removal, density scaling - but the
+        segments are transformed a batch at a time rather than inside welch's
+        single-threaded FFT call.
+        """
+        nperseg = min(nperseg, len(samples))
+        # Zero-pad to a fast FFT length, as in compute_spectrogram
+        nfft = next_fast_len(nperseg) if SCIPY_AVAILABLE else nperseg
+        hop_size = nperseg - nperseg // 2  # welch: noverlap = nperseg // 2
+        window = np.hanning(nperseg + 1)[:-1].astype(np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, nperseg)[::hop_size]
+        batch_frames = max(1, SPECTROGRAM_BATCH_FRAMES * 2048 // nperseg)
+
+        psd = np.zeros(nfft, dtype=np.float64)
+        for start in range(0, len(frames), batch_frames):
+            segments = frames[start:start + batch_frames]
+            segments = segments - segments.mean(axis=1, keepdims=True)
+            segments *= window
+            if SCIPY_AVAILABLE:
+                spectrum = fft(segments, n=nfft, axis=1, workers=os.cpu_count() or 1)
+            else:
+                spectrum = np.fft.fft(segments, axis=1)
+            psd += np.sum(np.square(spectrum.real), axis=0)
+            psd += np.sum(np.square(spectrum.imag), axis=0)
+
+        psd /= len(frames) * self.sample_rate * np.sum(np.square(window, dtype=np.float64))
+        return psd
+
     def compute_spectrogram(self, samples, nperseg=2048, noverlap=None, n_jobs=-1):
         """Compute spectrogram for time-frequency analysis with multi-core support
 
@@ -91,65 +320,111 @@ class GPSSpectrumAnalyzer:
         if noverlap is None:
             noverlap = nperseg // 2
 
+        if len(samples) < nperseg:
+            raise ValueError(f"Need at least {nperseg} samples for a spectrogram, got {len(samples)}")
+
+        # Zero-pad each segment to an FFT length with only small prime factors,
+        # so an unusual nperseg can't drop pocketfft onto its slow Bluestein path
+        nfft = next_fast_len(nperseg) if SCIPY_AVAILABLE else nperseg
+
         print(f"\nComputing spectrogram...")
         print(f"  FFT size: {nperseg}")
+        if nfft != nperseg:
+            print(f"  Zero-padded to fast FFT length: {nfft}")
         print(f"  Overlap: {noverlap}")
 
-        # Enable numpy multithreading for FFT operations
-        import os
+        # FFT worker threads (BLAS thread counts are fixed at import, see top of file)
         if n_jobs == -1:
             n_cores = os.cpu_count() or 1
         else:
             n_cores = max(1, n_jobs)
 
-        # Set environment variables for numpy/scipy BLAS threading
-        os.environ['OMP_NUM_THREADS'] = str(n_cores)
-        os.environ['OPENBLAS_NUM_THREADS'] = str(n_cores)
-        os.environ['MKL_NUM_THREADS'] = str(n_cores)
-        os.environ['NUMEXPR_NUM_THREADS'] = str(n_cores)
-
         print(f"  Using {n_cores} CPU cores for parallel processing")
 
         if SCIPY_AVAILABLE:
             import time
             start_time = time.time()
 
-            f, t, Sxx = signal.spectrogram(
-                samples,
-                fs=self.sample_rate,
-                nperseg=nperseg,
-                noverlap=noverlap,
-                window='boxcar',  # Rectangular window for best narrow-line resolution
-                return_onesided=False
-            )
+            # Same result as signal.spectrogram(window='boxcar', return_onesided=False),
+            # but the frames are a zero-copy strided view transformed in large
+            # multi-threaded FFT batches, and DC is centered while writing out
+            # instead of with extra fftshift copies
+            hop_size = nperseg - noverlap
+            frames = np.lib.stride_tricks.sliding_window_view(samples, nperseg)[::hop_size]
+            num_frames = len(frames)
+
+            Sxx = np.empty((nfft, num_frames), dtype=np.float32)
+            half = nfft // 2
+
+            for start in range(0, num_frames, SPECTROGRAM_BATCH_FRAMES):
+                stop = min(start + SPECTROGRAM_BATCH_FRAMES, num_frames)
+                # Single-precision FFT (no-op cast for complex64 recordings)
+                batch = frames[start:stop].astype(np.complex64, copy=False)
+                if nfft != nperseg:
+                    # Zero-padded segments: detrend='constant' has to subtract
+                    # each segment's mean before the FFT
+                    batch = batch - batch.mean(axis=1, keepdims=True)
+                spectrum = fft(batch, n=nfft, axis=1, workers=n_cores)
+
+                # |X|^2 without the sqrt of np.abs
+                power = np.square(spectrum.real)
+                power += np.square(spectrum.imag)
+
+                if nfft == nperseg:
+                    # Rectangular window for best narrow-line resolution; detrend='constant'
+                    # with a rectangular window only removes the DC bin
+                    power[:, 0] = 0
+
+                Sxx[:half, start:stop] = power[:, nfft - half:].T
+                Sxx[half:, start:stop] = power[:, :nfft - half].T
+
+            # PSD scaling (density) for a rectangular window
+            Sxx *= 1.0 / (self.sample_rate * nperseg)
+
+            f = self._freqs(nfft)
+            t = (np.arange(num_frames) * hop_size + nperseg / 2) / self.sample_rate
 
             elapsed = time.time() - start_time
             print(f"  Spectrogram computed in {elapsed:.1f} seconds")
-
-            # Shift to center DC
-            f = fftshift(f)
-            Sxx = fftshift(Sxx, axes=0)
         else:
-            # Manual spectrogram using numpy
+            # Manual spectrogram using numpy - one FFT call per batch of frames
+            # rather than a Python-level loop per frame
             hop_size = nperseg - noverlap
-            num_frames = (len(samples) - nperseg) // hop_size + 1
+            frames = np.lib.stride_tricks.sliding_window_view(samples, nperseg)[::hop_size]
+            num_frames = len(frames)
 
-            Sxx = np.zeros((nperseg, num_frames))
+            Sxx = np.empty((nfft, num_frames), dtype=np.float32)
             t = np.arange(num_frames) * hop_size / self.sample_rate
+            window = np.hanning(nperseg).astype(np.float32)
 
-            for i in range(num_frames):
-                start = i * hop_size
-                frame = samples[start:start + nperseg]
-                if len(frame) == nperseg:
+            # For short segments fold the window into the DFT matrix so each
+            # batch is a single BLAS call instead of thousands of tiny FFTs
+            dft = None
+            if nperseg <= DFT_GEMM_MAX_NPERSEG:
+                k = np.arange(nperseg)
+                dft = (window[:, None] * np.exp(-2j * np.pi * np.outer(k, k) / nperseg)).astype(np.complex64)
+
+            for start in range(0, num_frames, SPECTROGRAM_BATCH_FRAMES):
+                stop = min(start + SPECTROGRAM_BATCH_FRAMES, num_frames)
+
+                if dft is not None:
+                    spectrum = frames[start:stop] @ dft
+                else:
                     # Apply Hann window
-                    windowed = frame * np.hanning(nperseg)
-                    spectrum = np.abs(fft(windowed)) ** 2
-                    Sxx[:, i] = fftshift(spectrum)
+                    spectrum = np.fft.fft(frames[start:stop] * window, n=nfft, axis=1)
+                power = np.square(spectrum.real)
+                power += np.square(spectrum.imag)
+                Sxx[:, start:stop] = np.fft.fftshift(power, axes=1).T
 
-            f = fftshift(fftfreq(nperseg, 1/self.sample_rate))
+            f = self._freqs(nfft)
 
-        # Convert to dB
-        Sxx_db = 10 * np.log10(Sxx + 1e-12)
+        # Convert to dB - float32 is ample for the dB-domain detection thresholds
+        # and halves the memory of the (freq x time) array every detector scans.
+        # Done in place on Sxx: the add/log/scale steps make no full-size temporaries
+        Sxx_db = Sxx
+        Sxx_db += np.float32(1e-12)
+        np.log10(Sxx_db, out=Sxx_db)
+        Sxx_db *= np.float32(10)
 
         # Trim first 100ms of spectrogram to remove edge artifacts
         trim_time = 0.1  # 100ms
@@ -165,8 +440,13 @@ class GPSSpectrumAnalyzer:
 
         return f, t, Sxx_db
 
-    def detect_sweep_jammer(self, f, t, Sxx_db):
-        """Detect linear frequency sweep (common Russian jammer)"""
+    def detect_sweep_jammer(self, f, t, Sxx_db, peak_bins=None):
+        """Detect linear frequency sweep (common Russian jammer)
+
+        Args:
+            f, t, Sxx_db: Spectrogram from compute_spectrogram()
+            peak_bins: Precomputed peak_bins(f, Sxx_db), if available
+        """
         print("\n[1/4] Detecting SWEEP JAMMER...")
 
         # Look for linear frequency progression over time
@@ -176,16 +456,25 @@ class GPSSpectrumAnalyzer:
         sweep_rate = 0
         confidence = 0.0
 
+        # Only the GPS main lobe matters - row slices of Sxx_db are views
+        band = self.gps_band(f)
+
         # Calculate power variation across frequency bins over time
-        freq_variance = np.var(Sxx_db, axis=1)
+        freq_variance = np.var(Sxx_db[band], axis=1)
         max_variance_idx = np.argmax(freq_variance)
         max_variance = freq_variance[max_variance_idx]
 
         # High variance in a frequency bin suggests sweeping
         if max_variance > 15:  # dB threshold
             # Estimate sweep rate by finding slope in spectrogram
-            peak_freq_per_time = np.argmax(Sxx_db, axis=0)
-            sweep_rate = np.polyfit(t, f[peak_freq_per_time], 1)[0]
+            if peak_bins is None:
+                peak_bins = self.peak_bins(f, Sxx_db)
+            # Least-squares slope in closed form (what polyfit(deg=1) returns,
+            # without building and factorising its Vandermonde matrix)
+            dt = t - t.mean()
+            peak_freqs = f[peak_bins]
+            t_spread = np.dot(dt, dt)
+            sweep_rate = np.dot(dt, peak_freqs - peak_freqs.mean()) / t_spread if t_spread > 0 else 0.0
 
             # Only consider it a sweep if there's actual frequency movement
             # Sweep rate should be > 10 kHz/s (otherwise it's likely pulse/noise jammer)
@@ -208,23 +497,33 @@ class GPSSpectrumAnalyzer:
             'type': 'LINEAR_SWEEP'
         }
 
-    def detect_pulse_jammer(self, samples):
-        """Detect pulsed jamming (on/off pattern)"""
+    def detect_pulse_jammer(self, samples, power=None):
+        """Detect pulsed jamming (on/off pattern)
+
+        Args:
+            samples: IQ samples
+            power: Precomputed compute_power(samples), if available
+        """
         print("\n[2/4] Detecting PULSE JAMMER...")
 
         # Calculate instantaneous power
-        power = np.abs(samples) ** 2
+        if power is None:
+            power = self.compute_power(samples)
 
         # Smooth power envelope
         window_size = int(self.sample_rate * 0.001)  # 1ms window
-        power_smooth = np.convolve(power, np.ones(window_size)/window_size, mode='same')
+        power_smooth = moving_average(power, window_size)
 
-        # Detect sharp transitions
-        power_diff = np.abs(np.diff(power_smooth))
-        threshold = np.percentile(power_diff, 99)  # Top 1% of transitions
+        # Detect sharp transitions (|diff| built in place in a single array)
+        power_diff = np.subtract(power_smooth[1:], power_smooth[:-1])
+        np.abs(power_diff, out=power_diff)
 
-        pulses = power_diff > threshold
-        num_pulses = np.sum(pulses)
+        # Transitions are only counted from here on, so their order doesn't
+        # matter - partition in place rather than copying
+        threshold = percentile(power_diff, 99, overwrite_input=True)  # Top 1% of transitions
+
+        num_pulses = count_above(power_diff, threshold)
+        del power_diff
 
         detected = False
         pulse_rate = 0
@@ -239,9 +538,10 @@ class GPSSpectrumAnalyzer:
             duration = len(samples) / self.sample_rate
             pulse_rate = (num_pulses / 2) / duration
 
-            # Estimate duty cycle
-            high_power = power_smooth > np.median(power_smooth)
-            duty_cycle = np.sum(high_power) / len(high_power)
+            # Estimate duty cycle - power_smooth isn't needed after this, so
+            # its median may partition it in place (the count ignores order)
+            median_power = percentile(power_smooth, 50, overwrite_input=True)
+            duty_cycle = count_above(power_smooth, median_power) / len(power_smooth)
 
             confidence = min(num_pulses / 100, 1.0)
 
@@ -267,18 +567,13 @@ class GPSSpectrumAnalyzer:
         print("\n[3/4] Detecting NOISE JAMMER...")
 
         # Compute power spectral density
-        if SCIPY_AVAILABLE:
-            f, psd = signal.welch(samples, fs=self.sample_rate, nperseg=4096)
-        else:
-            spectrum = np.abs(fft(samples[:4096])) ** 2
-            psd = spectrum / len(spectrum)
-            f = fftfreq(len(spectrum), 1/self.sample_rate)
+        psd = self.compute_psd(samples, nperseg=4096)
 
         psd_db = 10 * np.log10(psd + 1e-12)
 
         # Calculate flatness (noise should be flat across band)
         psd_variation = np.std(psd_db)
-        noise_floor = np.median(psd_db)
+        noise_floor = percentile(psd_db, 50)
 
         detected = False
         noise_floor_db = float(noise_floor)
@@ -324,45 +619,50 @@ class GPSSpectrumAnalyzer:
 
         # Calculate noise floor from average spectrum (not max)
         mean_spectrum = np.mean(Sxx_db, axis=1)
-        noise_floor = np.percentile(mean_spectrum, 25)
+        noise_floor = percentile(mean_spectrum, 25)
 
         # Find peaks above noise floor - LOWERED threshold for weak lines
         threshold = noise_floor + 6  # 6 dB above noise floor (was 10 dB)
 
-        # Detect peaks using simple derivative method
-        peaks = []
-        for i in range(1, len(avg_spectrum) - 1):
-            if avg_spectrum[i] > threshold:
-                # Check if it's a local maximum
-                if avg_spectrum[i] > avg_spectrum[i-1] and avg_spectrum[i] > avg_spectrum[i+1]:
-                    # Estimate bandwidth by finding -3dB points
-                    peak_power = avg_spectrum[i]
-                    bw_threshold = peak_power - 3
-
-                    # Find left edge
-                    left_idx = i
-                    while left_idx > 0 and avg_spectrum[left_idx] > bw_threshold:
-                        left_idx -= 1
-
-                    # Find right edge
-                    right_idx = i
-                    while right_idx < len(avg_spectrum) - 1 and avg_spectrum[right_idx] > bw_threshold:
-                        right_idx += 1
-
-                    # Calculate bandwidth
-                    freq_res = f[1] - f[0]
-                    bandwidth_hz = (right_idx - left_idx) * freq_res
-
-                    # Only consider narrow-band signals (30 Hz to 2 kHz)
-                    # Accept very narrow lines down to 30 Hz (captures 50 Hz wide lines)
-                    if 30 < bandwidth_hz < 2000:
-                        peaks.append({
-                            'freq_hz': float(f[i]),
-                            'freq_mhz': float(f[i] / 1e6),
-                            'power_db': float(avg_spectrum[i]),
-                            'bandwidth_hz': float(bandwidth_hz),
-                            'snr_db': float(avg_spectrum[i] - noise_floor)
-                        })
+        # Detect peaks: local maxima above threshold (simple derivative method)
+        center = avg_spectrum[1:-1]
+        peak_idx = np.flatnonzero((center > threshold) &
+                                  (center > avg_spectrum[:-2]) &
+                                  (center > avg_spectrum[2:])) + 1
+
+        # Estimate bandwidth by finding -3dB points on each side of every peak.
+        # Only narrow lines are kept, so the edges need only be searched for
+        # max_walk bins out - anything further is too wide and rejected anyway
+        freq_res = f[1] - f[0]
+        last = len(avg_spectrum) - 1
+        max_walk = int(2000 / freq_res) + 1
+        steps = np.arange(1, max_walk + 1)
+        bw_threshold = (avg_spectrum[peak_idx] - 3)[:, None]
+
+        left_pos = np.maximum(peak_idx[:, None] - steps, 0)
+        left_stop = (avg_spectrum[left_pos] <= bw_threshold) | (left_pos == 0)
+        right_pos = np.minimum(peak_idx[:, None] + steps, last)
+        right_stop = (avg_spectrum[right_pos] <= bw_threshold) | (right_pos == last)
+
+        rows = np.arange(len(peak_idx))
+        left_idx = left_pos[rows, np.argmax(left_stop, axis=1)]
+        right_idx = right_pos[rows, np.argmax(right_stop, axis=1)]
+        edges_found = left_stop.any(axis=1) & right_stop.any(axis=1)
+
+        # Calculate bandwidth
+        bandwidth = (right_idx - left_idx) * freq_res
+
+        # Only consider narrow-band signals (30 Hz to 2 kHz)
+        # Accept very narrow lines down to 30 Hz (captures 50 Hz wide lines)
+        keep = edges_found & (bandwidth > 30) & (bandwidth < 2000)
+
+        peaks = [{
+            'freq_hz': float(f[i]),
+            'freq_mhz': float(f[i] / 1e6),
+            'power_db': float(avg_spectrum[i]),
+            'bandwidth_hz': float(bandwidth_hz),
+            'snr_db': float(avg_spectrum[i] - noise_floor)
+        } for i, bandwidth_hz in zip(peak_idx[keep], bandwidth[keep])]
 
         # Sort by power
         peaks.sort(key=lambda x: x['power_db'], reverse=True)
@@ -393,8 +693,15 @@ class GPSSpectrumAnalyzer:
             'type': 'NARROWBAND_CW'
         }
 
-    def detect_meaconing(self, samples, f, t, Sxx_db):
-        """Detect meaconing (GPS signal spoofing)"""
+    def detect_meaconing(self, samples, f, t, Sxx_db, power=None, peak_bins=None):
+        """Detect meaconing (GPS signal spoofing)
+
+        Args:
+            samples: IQ samples
+            f, t, Sxx_db: Spectrogram from compute_spectrogram()
+            power: Precomputed compute_power(samples), if available
+            peak_bins: Precomputed peak_bins(f, Sxx_db), if available
+        """
         print("\n[5/5] Detecting MEACONING/SPOOFING...")
 
         # Meaconing characteristics:
@@ -409,7 +716,8 @@ class GPSSpectrumAnalyzer:
         doppler_variation = 0
 
         # Calculate power in time domain
-        power = np.abs(samples) ** 2
+        if power is None:
+            power = self.compute_power(samples)
         avg_power = np.mean(power)
         max_power_dbfs = 10 * np.log10(avg_power + 1e-12)
 
@@ -425,8 +733,9 @@ class GPSSpectrumAnalyzer:
             # Real satellites have changing Doppler (±5 kHz over time)
             # Spoofed signals from ground transmitter are static
 
-            peak_freq_per_time = np.argmax(Sxx_db, axis=0)
-            doppler_variation = np.std(f[peak_freq_per_time])
+            if peak_bins is None:
+                peak_bins = self.peak_bins(f, Sxx_db)
+            doppler_variation = np.std(f[peak_bins])
 
             # Low Doppler variation suggests stationary transmitter (spoofing)
             if doppler_variation < 1000:  # Less than 1 kHz variation
@@ -512,6 +821,7 @@ Detection capabilities:
     parser.add_argument('-p', '--plot', type=str, help='Save spectrum plot to file')
     parser.add_argument('-o', '--output', type=str, help='JSON report output path')
     parser.add_argument('--sample-rate', type=float, default=2.048e6, help='Sample rate (default: 2.048 MSPS for GPS L1 main lobe)')
+    parser.add_argument('--work-rate', type=float, default=2.5e6, help='Decimate wider recordings to about this rate before analysis (default: 2.5 MSPS, 0 = off)')
 
     args = parser.parse_args()
 
@@ -536,7 +846,7 @@ Detection capabilities:
     print("")
 
     # Initialize analyzer
-    analyzer = GPSSpectrumAnalyzer(sample_rate=args.sample_rate)
+    analyzer = GPSSpectrumAnalyzer(sample_rate=args.sample_rate, work_rate=args.work_rate)
 
     # Load samples
     max_samples = None
@@ -544,6 +854,14 @@ Detection capabilities:
         max_samples = int(args.duration * args.sample_rate)
 
     samples = analyzer.load_samples(input_file, max_samples)
+    samples = analyzer.decimate_to_main_lobe(samples)
+
+    # The detectors need a few spectrogram frames to work with - stop here
+    # rather than fail on empty arrays after the spectrogram is computed
+    min_samples = 4 * 2048
+    if len(samples) < min_samples:
+        print(f"Error: Recording too short to analyze ({len(samples)} samples, need at least {min_samples})")
+        sys.exit(1)
 
     # Compute spectrogram optimized for 10 MSPS data with multi-core processing
     # MEMORY-OPTIMIZED SETTINGS for 60-second recordings:
@@ -557,13 +875,20 @@ Detection capabilities:
     print(f"{'='*70}")
     f, t, Sxx_db = analyzer.compute_spectrogram(samples, nperseg=2048, noverlap=1024, n_jobs=-1)
 
+    # Instantaneous power, shared by the pulse and meaconing detectors
+    power = analyzer.compute_power(samples)
+
+    # Strongest in-band bin per frame, shared by the sweep and meaconing detectors
+    peak_bins = analyzer.peak_bins(f, Sxx_db)
+
     # Run all detections
-    results = {}
-    results['sweep'] = analyzer.detect_sweep_jammer(f, t, Sxx_db)
-    results['pulse'] = analyzer.detect_pulse_jammer(samples)
-    results['noise'] = analyzer.detect_noise_jammer(samples)
-    results['narrowband'] = analyzer.detect_narrowband_signals(f, t, Sxx_db)
-    results['meaconing'] = analyzer.detect_meaconing(samples, f, t, Sxx_db)
+    results = run_detectors({
+        'sweep': (analyzer.detect_sweep_jammer, (f, t, Sxx_db, peak_bins)),
+        'pulse': (analyzer.detect_pulse_jammer, (samples, power)),
+        'noise': (analyzer.detect_noise_jammer, (samples,)),
+        'narrowband': (analyzer.detect_narrowband_signals, (f, t, Sxx_db)),
+        'meaconing': (analyzer.detect_meaconing, (samples, f, t, Sxx_db, power, peak_bins)),
+    })
 
     # Generate report
     output_path = args.output or input_file.replace('.dat', '_spectrum_analysis.json')
@@ -606,6 +931,39 @@ Detection capabilities:
     print("\n" + "=" * 70)
 
 
+def block_reduce_max(a, by, bx):
+    """Max over non-overlapping by x bx blocks of a 2-D array
+
+    Partial blocks at the far edges are reduced over what they hold, so no
+    row or column is lost. Built from strided np.maximum passes, so no
+    reshaped copy of the full array is made.
+    """
+    out = a[::by, ::bx].copy()
+    for i in range(by):
+        for j in range(bx):
+            if i or j:
+                part = a[i::by, j::bx]
+                dst = out[:part.shape[0], :part.shape[1]]
+                np.maximum(dst, part, out=dst)
+    return out
+
+
+def save_plot(output_path, dpi, tight=True):
+    """plt.savefig for the analyzer plots, with cheaper PNG compression
+
+    Pillow's default zlib level 6 dominates saving these large rasters;
+    level 3 writes several times faster for a slightly larger file.
+    tight=False skips bbox_inches='tight' (and its extra layout pass) for
+    figures whose margins are already set to fit.
+    """
+    kwargs = {}
+    if output_path.lower().endswith('.png'):
+        kwargs['pil_kwargs'] = {'compress_level': 3}
+    if tight:
+        kwargs['bbox_inches'] = 'tight'
+    plt.savefig(output_path, dpi=dpi, **kwargs)
+
+
 def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration=None, freq_offset=0):
     """Generate narrowband zoom plot (like SDRconnect zoomed view)"""
     print(f"\nGenerating narrowband zoom plot (±{zoom_bw/2e3:.0f} kHz, offset: {freq_offset/1e3:.0f} kHz)...")
@@ -645,7 +1003,7 @@ def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration
 
     # Enhanced contrast for subtle line visibility
     # Narrow dynamic range to emphasize weak spectral lines
-    vmin = np.percentile(Sxx_zoom, 60)  # Higher floor to suppress noise
+    vmin = percentile(Sxx_zoom, 60)  # Higher floor to suppress noise
     vmax = vmin + 8  # Very narrow 8 dB range to highlight subtle features
 
     print(f"  Zoomed region: {f_zoom[0]/1e3:.1f} to {f_zoom[-1]/1e3:.1f} kHz")
@@ -667,12 +1025,14 @@ def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration
     ax1 = fig.add_subplot(gs[0, 0])
     ax1.set_facecolor('#1a1a1a')
 
-    # Use 'gouraud' shading for smooth, anti-aliased appearance (no pixelation)
-    # This interpolates between data points for a continuous look
+    # Draw as a single image with bilinear resampling - the same smooth,
+    # non-pixelated look as gouraud-shaded pcolormesh, but done in one Agg
+    # pass instead of millions of interpolated quads (bins are evenly spaced)
     # Use 'viridis' colormap - gentle, perceptually uniform, great for subtle features
     # Dark blue background shows noise floor, bright yellow highlights lines
-    im = ax1.pcolormesh(t_zoom, f_zoom / 1e3, Sxx_zoom, shading='gouraud',
-                       cmap='viridis', vmin=vmin, vmax=vmax, rasterized=False)
+    im = ax1.imshow(Sxx_zoom, aspect='auto', origin='lower',
+                    extent=[t_zoom[0], t_zoom[-1], f_zoom[0] / 1e3, f_zoom[-1] / 1e3],
+                    interpolation='bilinear', cmap='viridis', vmin=vmin, vmax=vmax)
 
     ax1.set_ylabel('Frequency offset (kHz)', fontsize=14, fontweight='bold', color='white')
     ax1.set_xlabel('Time (s)', fontsize=14, fontweight='bold', color='white')
@@ -699,7 +1059,7 @@ def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration
     # Average spectrum panel
     ax2 = fig.add_subplot(gs[1, 0])
     ax2.set_facecolor('#1a1a1a')
-    avg_spectrum = np.mean(Sxx_zoom, axis=1)
+    avg_spectrum, time_power = spectrum_means(Sxx_zoom)
     ax2.plot(f_zoom / 1e3, avg_spectrum, 'cyan', linewidth=1.0, label='Average spectrum')
     ax2.set_ylabel('Power (dB)', fontsize=10, color='white')
     ax2.set_xlabel('Frequency offset (kHz)', fontsize=10, color='white')
@@ -720,7 +1080,6 @@ def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration
     # Time-domain power panel
     ax3 = fig.add_subplot(gs[2, 0])
     ax3.set_facecolor('#1a1a1a')
-    time_power = np.mean(Sxx_zoom, axis=0)
     ax3.plot(t_zoom, time_power, 'yellow', linewidth=1.0)
     ax3.set_ylabel('Power (dB)', fontsize=10, color='white')
     ax3.set_xlabel('Time (s)', fontsize=10, color='white')
@@ -733,24 +1092,25 @@ def plot_narrowband_zoom(f, t, Sxx_db, output_path, zoom_bw=200e3, time_duration
     ax3.spines['left'].set_color('white')
     ax3.spines['right'].set_color('white')
 
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    save_plot(output_path, dpi=150)
     plt.close()
     print(f"  Saved narrowband plot with {len(f_zoom)} freq bins × {len(t_zoom)} time bins (3-panel view)")
 
 
 def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     """Generate comprehensive spectrum analysis plot"""
-    # NO downsampling - preserve all spectral detail!
+    # NO averaging or decimation - preserve all spectral detail (the image is
+    # only max-pooled to the figure's pixel grid, which keeps every line visible)
     # High resolution is crucial for seeing ~300 Hz wide spectral lines
     print(f"\nGenerating plot with FULL resolution: {len(t)} time bins × {len(f)} frequency bins...")
 
     # Use same gentle dynamic range as narrowband for consistency
     # Narrow 8 dB range to emphasize subtle spectral lines
-    noise_floor = np.percentile(Sxx_db, 25)  # 25th percentile = noise floor
-    signal_peak = np.percentile(Sxx_db, 99.9)  # 99.9th percentile = peak signals
+    # 25th percentile = noise floor, 99.9th = peak signals, and a higher
+    # 60th percentile floor to suppress noise (all from one partition)
+    noise_floor, vmin, signal_peak = percentile(Sxx_db, [25, 60, 99.9])
 
     # Gentle dynamic range matching narrowband view
-    vmin = np.percentile(Sxx_db, 60)  # Higher floor to suppress noise
     vmax = vmin + 8  # Very narrow 8 dB range to highlight subtle features
 
     print(f"  Dynamic range: {vmin:.1f} to {vmax:.1f} dB ({vmax-vmin:.1f} dB span)")
@@ -758,9 +1118,11 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     print(f"  Peak signal (99.9th percentile): {signal_peak:.1f} dB")
 
     # Create EXTRA large figure for maximum detail
-    # Large DPI ensures all frequency bins are visible
-    fig = plt.figure(figsize=(24, 16), dpi=300)
-    gs = GridSpec(4, 1, figure=fig, hspace=0.25, height_ratios=[6, 1, 1, 0.5])
+    # 150 DPI keeps the PNG manageable; the spectrogram is max-pooled to fit it
+    fig = plt.figure(figsize=(24, 16), dpi=150)
+    # Margins sized to the content up front, so saving needs no tight-bbox pass
+    gs = GridSpec(4, 1, figure=fig, hspace=0.25, height_ratios=[6, 1, 1, 0.5],
+                  left=0.04, right=0.99, top=0.97, bottom=0.02)
 
     # Dark theme background matching narrowband
     fig.patch.set_facecolor('#0a0a0a')
@@ -768,11 +1130,31 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     # Main spectrogram - FULL WIDTH with time horizontal
     ax1 = fig.add_subplot(gs[0, 0])
     ax1.set_facecolor('#1a1a1a')
+    # Colorbar slot taken now, so ax1 already has its final size below
+    cax, cbar_kw = make_axes_gridspec(ax1)
 
     # Use 'viridis' colormap - same gentle colors as narrowband
     # Auto shading for speed (rasterized for large datasets)
-    im = ax1.pcolormesh(t, f / 1e6, Sxx_db, shading='auto',
+    # The spectrogram grid is evenly spaced, so draw it as one image rather than
+    # a QuadMesh of every (freq, time) cell - same pixels, far less work
+    uniform = (len(f) > 1 and len(t) > 1
+               and np.allclose(np.diff(f), f[1] - f[0]) and np.allclose(np.diff(t), t[1] - t[0]))
+    if uniform:
+        # Agg can't show more cells than the axes have pixels, so max-pool down
+        # to at most that size first (max, not mean, so narrow lines survive)
+        extent_px = ax1.get_window_extent()
+        by = max(1, -(-len(f) // int(extent_px.height)))
+        bx = max(1, -(-len(t) // int(extent_px.width)))
+        Sxx_plot = block_reduce_max(Sxx_db, by, bx)
+        if by > 1 or bx > 1:
+            print(f"  Max-pooled {by}×{bx} to {Sxx_plot.shape[1]} time × {Sxx_plot.shape[0]} frequency cells for drawing")
+
+        im = ax1.imshow(Sxx_plot, aspect='auto', origin='lower', interpolation='nearest',
+                        extent=[t[0], t[-1], f[0] / 1e6, f[-1] / 1e6],
                         cmap='viridis', vmin=vmin, vmax=vmax, rasterized=True)
+    else:
+        im = ax1.pcolormesh(t, f / 1e6, Sxx_db, shading='auto',
+                            cmap='viridis', vmin=vmin, vmax=vmax, rasterized=True)
     ax1.set_ylabel('Frequency offset (MHz)', fontsize=11, color='white')
     ax1.set_xlabel('Time (s)', fontsize=11, color='white')
     ax1.set_title(f'GPS L1 Spectrogram - Jamming Detection (Resolution: {f[1]-f[0]:.1f} Hz/bin)',
@@ -785,7 +1167,7 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     ax1.spines['left'].set_color('white')
     ax1.spines['right'].set_color('white')
 
-    cbar = plt.colorbar(im, ax=ax1, label='Power (dB)')
+    cbar = plt.colorbar(im, cax=cax, label='Power (dB)', **cbar_kw)
     cbar.set_label('Power (dB)', fontsize=10, color='white')
     cbar.ax.tick_params(colors='white')
     cbar.outline.set_edgecolor('white')
@@ -806,18 +1188,20 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     # Average spectrum - FULL WIDTH below spectrogram
     ax2 = fig.add_subplot(gs[1, 0])
     ax2.set_facecolor('#1a1a1a')
-    avg_spectrum = np.mean(Sxx_db, axis=1)
+    avg_spectrum, time_power = spectrum_means(Sxx_db)
     ax2.plot(f / 1e6, avg_spectrum, 'cyan', linewidth=0.8, label='Average spectrum')
 
     # Highlight narrow-band signals if detected
     if 'narrowband' in results and results['narrowband']['detected']:
-        peaks = results['narrowband']['peaks']
-        for peak in peaks[:10]:  # Show top 10 on plot
-            freq_mhz = peak['freq_mhz']
-            # Draw vertical line at peak frequency
-            ax2.axvline(freq_mhz, color='yellow', linestyle='--', linewidth=1, alpha=0.6)
-            # Annotate with bandwidth
-            ax2.text(freq_mhz, ax2.get_ylim()[1], f"{peak['bandwidth_hz']:.0f}Hz",
+        peaks = results['narrowband']['peaks'][:10]  # Show top 10 on plot
+        # Draw all vertical peak lines as one LineCollection (full axes height,
+        # like axvline) instead of one Line2D artist per peak
+        ax2.vlines([peak['freq_mhz'] for peak in peaks], 0, 1, transform=ax2.get_xaxis_transform(),
+                   colors='yellow', linestyles='--', linewidths=1, alpha=0.6)
+        # Annotate with bandwidth
+        label_y = ax2.get_ylim()[1]
+        for peak in peaks:
+            ax2.text(peak['freq_mhz'], label_y, f"{peak['bandwidth_hz']:.0f}Hz",
                     rotation=90, fontsize=7, color='yellow', alpha=0.8,
                     verticalalignment='top', horizontalalignment='right')
 
@@ -840,7 +1224,6 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
     # Time-domain power - FULL WIDTH
     ax3 = fig.add_subplot(gs[2, 0])
     ax3.set_facecolor('#1a1a1a')
-    time_power = np.mean(Sxx_db, axis=0)
     ax3.plot(t, time_power, 'yellow', linewidth=0.8)
     ax3.set_ylabel('Power (dB)', fontsize=10, color='white')
     ax3.set_xlabel('Time (s)', fontsize=10, color='white')
@@ -883,8 +1266,8 @@ def plot_spectrum(f, t, Sxx_db, results, output_path, sample_rate=2048000):
             bbox=dict(boxstyle='round', facecolor='yellow' if metrics_lines else 'lightgreen', alpha=0.7),
             fontweight='bold')
 
-    # Save at 300 DPI to match figure DPI - preserves all detail
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    # Save at 150 DPI to match figure DPI
+    save_plot(output_path, dpi=150, tight=False)
     plt.close()
     print(f"Saved high-resolution plot: {output_path}")
 
@@ -47,6 +47,18 @@ RECORDING_CONFIG = {
 # Ensure recordings directory exists
 os.makedirs(RECORDINGS_DIR, exist_ok=True)
 
+# Log timestamps only have second resolution, so format each second once
+_log_time_cache = (0, '')
+
+
+def log_time():
+    """Current wall-clock time as HH:MM:SS for log lines"""
+    global _log_time_cache
+    now = int(time.time())
+    if now != _log_time_cache[0]:
+        _log_time_cache = (now, time.strftime('%H:%M:%S', time.localtime(now)))
+    return _log_time_cache[1]
+
 
 def detect_available_device():
     """
@@ -184,7 +196,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                 file_size = os.path.getsize(current_recording) if os.path.exists(current_recording) else 0
                 if file_size == 0:
                     recording_error = 'Recording failed - device may be in use by another application'
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Recording failed: 0 bytes written (device in use?)")
+                    print(f"[{log_time()}] Recording failed: 0 bytes written (device in use?)")
                 elif exit_code != 0:
                     recording_error = f'Recording exited with code {exit_code}'
 
@@ -194,7 +206,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                 exit_code = processing_process.returncode
                 if exit_code != 0:
                     processing_error = f'GNSS-SDR exited with code {exit_code}'
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] GNSS-SDR processing failed: exit code {exit_code}")
+                    print(f"[{log_time()}] GNSS-SDR processing failed: exit code {exit_code}")
 
             status = {
                 'recording': {
@@ -380,7 +392,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
         if self.path == '/gnss/start-recording':
             # Start recording
             try:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Received recording request: {data}")
+                print(f"[{log_time()}] Received recording request: {data}")
                 duration = data.get('duration', RECORDING_CONFIG['duration_default'])
                 # Allow tuner selection from request, fallback to config default
                 tuner = data.get('tuner', RECORDING_CONFIG['tuner'])
@@ -388,17 +400,17 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                 device_type = data.get('device_type', 'sdrplay')  # Default to sdrplay for backward compatibility
                 # NEW: Decoder selection affects sample rate
                 decoder = data.get('decoder', 'gnss-sdr')  # Default to GNSS-SDR
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Extracted decoder: '{decoder}', device_type: '{device_type}')")
+                print(f"[{log_time()}] Extracted decoder: '{decoder}', device_type: '{device_type}')")
 
                 # Adjust sample rate based on decoder
                 # Gypsum requires exactly 2.046 MHz (2x PRN rate)
                 # GNSS-SDR works with any sample rate
                 if decoder == 'gypsum':
                     sample_rate = 2046000  # Exactly 2.046 MHz for Gypsum
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Using 2.046 MHz sample rate for Gypsum decoder")
+                    print(f"[{log_time()}] Using 2.046 MHz sample rate for Gypsum decoder")
                 else:
                     sample_rate = RECORDING_CONFIG['sample_rate']  # Default 2.048 MHz for GNSS-SDR
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Using {sample_rate/1e6:.3f} MHz sample rate for GNSS-SDR decoder")
+                    print(f"[{log_time()}] Using {sample_rate/1e6:.3f} MHz sample rate for GNSS-SDR decoder")
 
                 if recording_process and recording_process.poll() is None:
                     self._set_headers(400)
@@ -425,10 +437,10 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                 # Select recording script based on device type
                 if device_type == 'sdrplay':
                     record_script = os.path.join(SCRIPT_DIR, 'sdrplay_direct.py')
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Using SDRplay device for recording")
+                    print(f"[{log_time()}] Using SDRplay device for recording")
                 elif device_type == 'rtlsdr':
                     record_script = os.path.join(SCRIPT_DIR, 'rtlsdr_direct.py')
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Using RTL-SDR device for recording")
+                    print(f"[{log_time()}] Using RTL-SDR device for recording")
 
                 # Start recording
                 env = os.environ.copy()
@@ -543,7 +555,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
 
                 # Wait briefly for file to be fully written if it was just created
                 if not os.path.exists(filepath):
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] File not found immediately, waiting 2s...")
+                    print(f"[{log_time()}] File not found immediately, waiting 2s...")
                     time.sleep(2)
 
                 if not os.path.exists(filepath):
@@ -564,8 +576,8 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                     }).encode())
                     return
 
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Processing file: {filepath} ({file_size / 1e9:.2f} GB)")
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] Using decoder: {decoder}")
+                print(f"[{log_time()}] Processing file: {filepath} ({file_size / 1e9:.2f} GB)")
+                print(f"[{log_time()}] Using decoder: {decoder}")
 
                 if processing_process and processing_process.poll() is None:
                     self._set_headers(400)
@@ -581,7 +593,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
 
                 if decoder == 'gypsum':
                     # Use Gypsum decoder (Python-based GPS receiver)
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting Gypsum decoder...")
+                    print(f"[{log_time()}] Starting Gypsum decoder...")
 
                     # Check if gypsum_simple_wrapper.py exists
                     gypsum_wrapper = os.path.join(os.path.dirname(SCRIPT_DIR), 'rtl-sdr-gps', 'gypsum_simple_wrapper.py')
@@ -599,7 +611,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                     # We'll default to 2.046 MHz (Gypsum's expected rate)
                     sample_rate = 2046000  # Default for Gypsum
 
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Using sample rate {sample_rate/1e6:.3f} MHz for Gypsum")
+                    print(f"[{log_time()}] Using sample rate {sample_rate/1e6:.3f} MHz for Gypsum")
 
                     # Run Gypsum wrapper with sample rate
                     cmd = f"python3 {gypsum_wrapper} --input {filepath} --output {RECORDINGS_DIR} --sample-rate {sample_rate}"
@@ -620,8 +632,8 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                     processing_start_time = time.time()
                     processing_status = 'Gypsum decoding started...'
 
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Gypsum decoder started")
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Command: {cmd}")
+                    print(f"[{log_time()}] Gypsum decoder started")
+                    print(f"[{log_time()}] Command: {cmd}")
 
                     # Start log streaming thread for Gypsum
                     def stream_gypsum_logs():
@@ -630,7 +642,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                         log_lines = []
 
                         try:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Streaming Gypsum logs...")
+                            print(f"[{log_time()}] Streaming Gypsum logs...")
 
                             with open(log_filename, 'w') as log_file:
                                 for line in processing_process.stdout:
@@ -651,10 +663,10 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                                     except:
                                         pass
 
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Gypsum log saved to: {log_filename}")
+                            print(f"[{log_time()}] Gypsum log saved to: {log_filename}")
 
                         except Exception as e:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Error streaming Gypsum logs: {e}")
+                            print(f"[{log_time()}] Error streaming Gypsum logs: {e}")
 
                     threading.Thread(target=stream_gypsum_logs, daemon=True).start()
 
@@ -668,7 +680,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
 
                 elif decoder == 'gnss-sdr':
                     # Use GNSS-SDR decoder (professional/reference implementation)
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting GNSS-SDR decoder...")
+                    print(f"[{log_time()}] Starting GNSS-SDR decoder...")
 
                     # Create GNSS-SDR config from template
                     config_path = os.path.join(RECORDINGS_DIR, f"{filename}.conf")
@@ -679,7 +691,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
 
                     if os.path.exists(template_path):
                         # Use template and customize paths
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Using template: {template_path}")
+                        print(f"[{log_time()}] Using template: {template_path}")
                         with open(template_path, 'r') as f:
                             config_content = f.read()
 
@@ -701,7 +713,7 @@ class RecordingAPIHandler(BaseHTTPRequestHandler):
                             )
                     else:
                         # Fallback to hardcoded config if template doesn't exist
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Template not found, using default config")
+                        print(f"[{log_time()}] Template not found, using default config")
                         config_content = f"""; GNSS-SDR Configuration (Auto-generated)
 ; 2.048 MSPS sample rate for GPS L1 main lobe
 [GNSS-SDR]
@@ -781,7 +793,7 @@ PVT.monitor_udp_port=1234
                     processing_status = 'GNSS-SDR processing started...'
 
                     # Log that processing started
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting GNSS-SDR processing:")
+                    print(f"[{log_time()}] Starting GNSS-SDR processing:")
                     print(f"  Config: {config_path}")
                     print(f"  Input: {filepath}")
                     print(f"  Output base: {output_basename}")
@@ -805,16 +817,16 @@ PVT.monitor_udp_port=1234
                                 try:
                                     # Connect to WebSocket bridge
                                     ws = await websockets.connect('ws://localhost:8766')
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Connected to WebSocket bridge for log streaming")
+                                    print(f"[{log_time()}] Connected to WebSocket bridge for log streaming")
                                 except Exception as e:
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Warning: Could not connect to WebSocket: {e}")
+                                    print(f"[{log_time()}] Warning: Could not connect to WebSocket: {e}")
 
                                 try:
                                     # Open log file for writing
                                     log_file = open(log_filename, 'w', buffering=1)
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Saving GNSS-SDR logs to: {log_filename}")
+                                    print(f"[{log_time()}] Saving GNSS-SDR logs to: {log_filename}")
                                 except Exception as e:
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Warning: Could not open log file: {e}")
+                                    print(f"[{log_time()}] Warning: Could not open log file: {e}")
 
                                 # Stream logs line by line
                                 try:
@@ -840,13 +852,13 @@ PVT.monitor_udp_port=1234
                                                 }
                                                 await ws.send(json_lib.dumps(log_msg))
                                             except Exception as ws_error:
-                                                print(f"[{datetime.now().strftime('%H:%M:%S')}] WebSocket send error at receiver time {line.strip()}: {ws_error}")
+                                                print(f"[{log_time()}] WebSocket send error at receiver time {line.strip()}: {ws_error}")
                                                 ws = None  # Mark as disconnected to prevent further errors
 
                                 finally:
                                     if log_file:
                                         log_file.close()
-                                        print(f"[{datetime.now().strftime('%H:%M:%S')}] GNSS-SDR log saved to: {log_filename}")
+                                        print(f"[{log_time()}] GNSS-SDR log saved to: {log_filename}")
                                     if ws:
                                         await ws.close()
 
@@ -855,7 +867,7 @@ PVT.monitor_udp_port=1234
 
                         except Exception as e:
                             # Fall back to just printing and saving logs
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] WebSocket error, saving logs to file only: {e}")
+                            print(f"[{log_time()}] WebSocket error, saving logs to file only: {e}")
                             try:
                                 with open(log_filename, 'w', buffering=1) as log_file:
                                     for line in iter(processing_process.stdout.readline, ''):
@@ -863,7 +875,7 @@ PVT.monitor_udp_port=1234
                                             print(f"[GNSS-SDR] {line.rstrip()}")
                                             log_file.write(line)
                             except Exception as e2:
-                                print(f"[{datetime.now().strftime('%H:%M:%S')}] Could not save logs: {e2}")
+                                print(f"[{log_time()}] Could not save logs: {e2}")
 
                     # Start log streaming thread
                     log_thread = threading.Thread(target=stream_logs, daemon=True)
@@ -875,7 +887,7 @@ PVT.monitor_udp_port=1234
                         try:
                             spectrum_script = os.path.join(SCRIPT_DIR, 'gps_spectrum_analyzer.py')
                             if os.path.exists(spectrum_script):
-                                print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting spectrum analysis...")
+                                print(f"[{log_time()}] Starting spectrum analysis...")
 
                                 # Analyze first 60 seconds with 2.048 MSPS (5× less data than 10 MSPS!)
                                 # At 2.048 MSPS: 60s = 122M samples (vs 600M at 10 MSPS)
@@ -894,16 +906,16 @@ PVT.monitor_udp_port=1234
 
                                 # Log any errors
                                 if result.returncode != 0:
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Spectrum analysis failed:")
+                                    print(f"[{log_time()}] Spectrum analysis failed:")
                                     print(f"  stdout: {result.stdout}")
                                     print(f"  stderr: {result.stderr}")
                                 elif result.stderr:
-                                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Spectrum analysis warnings:")
+                                    print(f"[{log_time()}] Spectrum analysis warnings:")
                                     print(f"  {result.stderr}")
 
-                                print(f"[{datetime.now().strftime('%H:%M:%S')}] Spectrum analysis complete: {spectrum_output}")
+                                print(f"[{log_time()}] Spectrum analysis complete: {spectrum_output}")
                         except Exception as e:
-                            print(f"[{datetime.now().strftime('%H:%M:%S')}] Spectrum analysis error: {e}")
+                            print(f"[{log_time()}] Spectrum analysis error: {e}")
 
                     # Start spectrum analysis thread
                     spectrum_thread = threading.Thread(target=run_spectrum_analysis, daemon=True)
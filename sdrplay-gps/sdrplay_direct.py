@@ -64,6 +64,11 @@ else:
 
 
 # SDRplay API Constants
+# Device slots passed to sdrplay_api_GetDevices. The API allows up to 16, but
+# a single host realistically has a handful and every slot is a large struct
+# that ctypes zero-initializes.
+MAX_DEVICES = 4
+
 class sdrplay_api_ErrT(IntEnum):
     """Error codes from SDRplay API"""
     Success = 0
@@ -623,9 +628,9 @@ class SDRplayDevice:
             raise RuntimeError(f"Failed to lock API: error {err}")
 
         # Get device list
-        devices = (sdrplay_api_DeviceT * 16)()
+        devices = (sdrplay_api_DeviceT * MAX_DEVICES)()
         num_devices = c_uint(0)
-        err = self.lib.sdrplay_api_GetDevices(devices, byref(num_devices), c_uint(16))
+        err = self.lib.sdrplay_api_GetDevices(devices, byref(num_devices), c_uint(MAX_DEVICES))
 
         if err != sdrplay_api_ErrT.Success or num_devices.value == 0:
             self.lib.sdrplay_api_UnlockDeviceApi()
@@ -634,11 +639,14 @@ class SDRplayDevice:
         print(f"✓ Found {num_devices.value} SDRplay device(s)")
 
         # Select device
+        # Decode each serial once - every ctypes field access goes through a
+        # descriptor and SerNo also builds a new bytes object
         selected = None
         for i in range(num_devices.value):
             dev = devices[i]
-            print(f"  Device {i}: (Serial: {dev.SerNo.decode()})")
-            if serial_number is None or dev.SerNo.decode() == serial_number:
+            serial = dev.SerNo.decode()
+            print(f"  Device {i}: (Serial: {serial})")
+            if serial_number is None or serial == serial_number:
                 selected = dev
                 break
 
@@ -647,14 +655,15 @@ class SDRplayDevice:
             raise RuntimeError(f"Device with serial {serial_number} not found")
 
         self.device = selected
-        print(f"✓ Selected device: {self.device.SerNo.decode()}")
+        print(f"✓ Selected device: {serial}")
 
         # Configure RSPduo mode if this is an RSPduo
         # hwVer=3 is shared by RSP2 and RSPduo, distinguish by rspDuoMode
-        if self.device.rspDuoMode != 0:
+        rsp_duo_mode = self.device.rspDuoMode
+        if rsp_duo_mode != 0:
             # This is an RSPduo - configure Single Tuner mode for 10 MSPS support
             # Master mode maxes out at 8 MSPS, Single Tuner supports up to 10 MSPS
-            print(f"✓ RSPduo detected (current mode: {self.device.rspDuoMode})")
+            print(f"✓ RSPduo detected (current mode: {rsp_duo_mode})")
             self.device.rspDuoMode = sdrplay_api_RspDuoModeT.Single_Tuner  # 1
             self.device.tuner = sdrplay_api_TunerSelectT.Tuner_A  # 1 - use Tuner A
             self.device.rspDuoSampleFreq = 10e6  # 10 MSPS for Single Tuner mode
@@ -38,7 +38,8 @@ import numpy as np
 import argparse
 import sys
 import signal
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import SoapySDR
@@ -53,6 +54,11 @@ except ImportError:
     sys.exit(1)
 
 
+def timestamp():
+    """Wall-clock time for log lines (HH:MM:SS) without building a datetime"""
+    return time.strftime('%H:%M:%S')
+
+
 class SDRPlayBridge:
     def __init__(self, frequency=1575.42e6, sample_rate=2.048e6, gain=40, port=8765,
                  tuner=1, bias_tee=False):
@@ -83,6 +89,11 @@ class SDRPlayBridge:
         # Buffer size for reading samples (1024 samples = ~0.5ms at 2.048 MSPS)
         self.buffer_size = 16384  # 8ms of data
 
+        # Reusable buffers so the read loop doesn't allocate per block
+        self._buffer = np.empty(self.buffer_size, dtype=np.complex64)
+        self._scaled = np.empty(self.buffer_size * 2, dtype=np.float32)
+        self._iq_uint8 = np.empty(self.buffer_size * 2, dtype=np.uint8)
+
     def setup_sdr(self):
         """Initialize and configure SDRPlay device"""
         try:
@@ -299,32 +310,37 @@ class SDRPlayBridge:
             self.running = False
             print("Streaming stopped!")
 
-    def read_samples(self):
-        """Read IQ samples from SDR and convert to uint8 format (RTL-SDR compatible)"""
+    def read_samples(self, convert=True):
+        """
+        Read IQ samples from SDR and convert to uint8 format (RTL-SDR compatible)
+
+        Args:
+            convert: If False, only drain the stream (keeps the device from
+                     overflowing) and skip the conversion - used when no
+                     client is connected
+        """
         if not self.stream or not self.running:
             return None
 
         # Read complex float samples
-        buffer = np.zeros(self.buffer_size, dtype=np.complex64)
-        sr = self.sdr.readStream(self.stream, [buffer], self.buffer_size, timeoutUs=1000000)
+        sr = self.sdr.readStream(self.stream, [self._buffer], self.buffer_size, timeoutUs=1000000)
 
-        if sr.ret > 0:
+        if sr.ret > 0 and convert:
             # Convert complex float to interleaved I/Q uint8 (RTL-SDR format)
             # SoapySDR gives [-1, +1], convert to [0, 255]
-            samples = buffer[:sr.ret]
+            # complex64 is already I/Q interleaved in memory - view it as a flat
+            # float32 array so every step is one contiguous pass
+            samples = self._buffer[:sr.ret].view(np.float32)
 
-            # Separate I and Q
-            i_samples = np.real(samples)
-            q_samples = np.imag(samples)
+            # Convert to [0, 255] with 127.5 as center, in the preallocated scratch buffer
+            scaled = self._scaled[:sr.ret * 2]
+            np.multiply(samples, 127.5, out=scaled)
+            scaled += 127.5
+            np.clip(scaled, 0, 255, out=scaled)
 
-            # Convert to uint8 [0, 255] with 127.5 as center
-            i_uint8 = np.clip((i_samples * 127.5 + 127.5), 0, 255).astype(np.uint8)
-            q_uint8 = np.clip((q_samples * 127.5 + 127.5), 0, 255).astype(np.uint8)
-
-            # Interleave I and Q
-            iq_interleaved = np.empty(sr.ret * 2, dtype=np.uint8)
-            iq_interleaved[0::2] = i_uint8
-            iq_interleaved[1::2] = q_uint8
+            # Cast into the reusable uint8 buffer
+            iq_interleaved = self._iq_uint8[:sr.ret * 2]
+            iq_interleaved[:] = scaled
 
             return iq_interleaved.tobytes()
 
@@ -333,7 +349,7 @@ class SDRPlayBridge:
     async def handle_client(self, websocket):
         """Handle WebSocket client connection"""
         client_addr = websocket.remote_address
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Client connected: {client_addr}")
+        print(f"[{timestamp()}] Client connected: {client_addr}")
         self.clients.add(websocket)
 
         try:
@@ -343,42 +359,48 @@ class SDRPlayBridge:
         except websockets.exceptions.ConnectionClosed:
             pass
         finally:
-            self.clients.remove(websocket)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Client disconnected: {client_addr}")
+            self.clients.discard(websocket)  # May already be dropped by stream_samples
+            print(f"[{timestamp()}] Client disconnected: {client_addr}")
 
     async def stream_samples(self):
         """Continuously read samples and broadcast to all connected clients"""
         print("Starting sample streaming loop...")
         sample_count = 0
-        last_report = datetime.now()
-
-        while self.running:
-            # Read samples from SDR
-            data = self.read_samples()
-
-            if data and self.clients:
-                # Broadcast to all connected clients
-                disconnected = set()
-                for client in self.clients:
-                    try:
-                        await client.send(data)
-                        sample_count += len(data)
-                    except websockets.exceptions.ConnectionClosed:
-                        disconnected.add(client)
-
-                # Remove disconnected clients
-                self.clients -= disconnected
-
-                # Report throughput every second
-                now = datetime.now()
-                if (now - last_report).total_seconds() >= 1.0:
-                    mbps = (sample_count * 8) / 1e6
-                    print(f"[{now.strftime('%H:%M:%S')}] Streaming: {mbps:.2f} Mbps, {len(self.clients)} client(s)")
-                    sample_count = 0
-                    last_report = now
-
-            # Small delay to prevent CPU spinning
-            await asyncio.sleep(0.001)
+        last_report = time.monotonic()
+        loop = asyncio.get_running_loop()
+
+        # readStream blocks for up to 1 s and the conversion is CPU work, so run
+        # both on a dedicated thread to keep the event loop free for clients.
+        # A single worker keeps reads in order and the shared buffers safe, and
+        # awaiting it paces the loop at the device rate - no polling sleep needed.
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            while self.running:
+                # Read samples from SDR (only converted when someone is listening)
+                data = await loop.run_in_executor(reader, self.read_samples, bool(self.clients))
+
+                if data and self.clients:
+                    # Broadcast to all connected clients concurrently, so one slow
+                    # client doesn't hold up delivery to the others
+                    clients = list(self.clients)
+                    results = await asyncio.gather(*(client.send(data) for client in clients),
+                                                   return_exceptions=True)
+
+                    for client, result in zip(clients, results):
+                        if isinstance(result, websockets.exceptions.ConnectionClosed):
+                            # Drop disconnected clients right away
+                            self.clients.discard(client)
+                        elif isinstance(result, BaseException):
+                            raise result
+                        else:
+                            sample_count += len(data)
+
+                    # Report throughput every second
+                    now = time.monotonic()
+                    if now - last_report >= 1.0:
+                        mbps = (sample_count * 8) / 1e6
+                        print(f"[{timestamp()}] Streaming: {mbps:.2f} Mbps, {len(self.clients)} client(s)")
+                        sample_count = 0
+                        last_report = now
 
     async def run_server(self):
         """Run WebSocket server"""
@@ -386,7 +408,9 @@ class SDRPlayBridge:
         print(f"Connect web-spectrum to: ws://localhost:{self.port}")
         print("\nPress Ctrl+C to stop\n")
 
-        async with websockets.serve(self.handle_client, "0.0.0.0", self.port):
+        # No permessage-deflate: noisy 8-bit IQ only shrinks ~15% while zlib
+        # costs ~1.5 ms per 32 KB frame, per client
+        async with websockets.serve(self.handle_client, "0.0.0.0", self.port, compression=None):
             # Start streaming task
             stream_task = asyncio.create_task(self.stream_samples())
 